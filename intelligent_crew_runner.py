@@ -4,28 +4,232 @@ Intelligent CrewAI Runner - Uses Task Designer Agent to create project-specific
 Replaces the generic hard-coded tasks with dynamically generated ones
 """
 
+import asyncio
+import contextvars
+import functools
+import io
+import textwrap
+import threading
 import time
-import json
 import os
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Optional, TextIO
+import numpy as np
+import orjson
+import zstandard as zstd
 from crewai import Crew, Agent, Task
-from task_designer_agent import TaskDesignerAgent, analyze_and_design_tasks
+from crewai.events import LLMStreamChunkEvent, crewai_event_bus
+from openai import APIConnectionError, InternalServerError, RateLimitError
+from langchain_openai import OpenAIEmbeddings
+from tenacity import AsyncRetrying, RetryCallState, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+from llm_cache import ZSTD_LEVEL
+from task_designer_agent import analyze_and_design_tasks, get_designer
+from rate_limiter import wait_retry_after
+from openai_client import EXECUTOR_MODEL, build_llm, count_tokens, get_http_client, get_key_rotator
+
+# Reserved for the model's reply when budgeting tokens per task
+OUTPUT_TOKEN_BUDGET = 512
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+
+# Fixed pieces of the combined markdown report
+_REPORT_TITLE = "# INTELLIGENT PROJECT DEVELOPMENT RESULTS\nGenerated: "
+_ANALYSIS_HEADING = "\n\n## PROJECT ANALYSIS\n"
+_RESULTS_HEADING = "\n\n## TASK EXECUTION RESULTS\n\n"
+_STATUS_FAILED = "**Status:** Failed\n"
+_STATUS_SUCCESS = "**Status:** Success\n"
+_GUIDE_HEADING = "## IMPLEMENTATION GUIDE\n"
+
+
+def _dedupe_text(task: Dict) -> str:
+    """What find_duplicate_tasks embeds for a task"""
+    return f"{task.get('name', '')}\n{task.get('description', '')}"
+
+
+def find_duplicate_tasks(custom_tasks: List[Dict], threshold: float = 0.95, api_key: Optional[str] = None) -> Dict[int, int]:
+    """Map each near-duplicate task (1-based) to the earlier task it repeats
+
+    All task prompts are embedded in one batched request and compared with a
+    single cosine-similarity matrix.
+    """
+
+    embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL, api_key=api_key, http_client=get_http_client())
+    texts = [_dedupe_text(t) for t in custom_tasks]
+    vectors = np.array(embeddings.embed_documents(texts), dtype=np.float32)
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.maximum(norms, 1e-12)
+    similarity = vectors @ vectors.T
+
+    duplicate_of: Dict[int, int] = {}
+    for j in range(1, len(custom_tasks)):
+        for i in range(j):
+            # Only representatives can absorb later tasks
+            if i + 1 not in duplicate_of and similarity[i, j] >= threshold:
+                duplicate_of[j + 1] = i + 1
+                break
+    return duplicate_of
+
+
+def _write_json_atomic(path: str, data: Any) -> None:
+    """Write JSON via a temp file + rename so readers never see a partial file
+
+    Paths ending in .zst are zstandard-compressed.
+    """
+
+    payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str)
+    if path.endswith('.zst'):
+        payload = zstd.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def _write_checkpoint(path: str, results: Dict) -> None:
+    """Best-effort _write_json_atomic: a failed checkpoint must not fail the tasks it records"""
+
+    try:
+        _write_json_atomic(path, results)
+    except (OSError, TypeError) as e:  # orjson.JSONEncodeError is a TypeError
+        print(f"Warning: Could not write checkpoint {path}: {e}")
+
+
+def load_results(path: str) -> Dict:
+    """Read a results file written by this runner (.json or .json.zst)"""
+
+    with open(path, 'rb') as f:
+        payload = f.read()
+    if path.endswith('.zst'):
+        payload = zstd.ZstdDecompressor().decompress(payload)
+    return orjson.loads(payload)
+
+
+class TaskStreamWriter:
+    """Appends streamed LLM tokens for one task to a .jsonl file as they arrive
+
+    Writes after close() are dropped, e.g. chunks from an attempt abandoned
+    by a timeout that keeps streaming in its thread.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def write(self, token: str) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            if self._file is None:
+                self._file = open(self.path, 'ab', buffering=0)  # Unbuffered: each chunk hits disk
+            self._file.write(orjson.dumps({'token': token}, option=orjson.OPT_APPEND_NEWLINE))
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+async def run_in_daemon_thread(func: Callable[[], Any]) -> Any:
+    """Await a blocking call made in its own daemon thread
+
+    Unlike asyncio.to_thread, a call abandoned by a timeout neither holds a
+    default-executor worker nor keeps asyncio.run() (or interpreter exit)
+    waiting until it returns; its eventual result is discarded.
+    """
+
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    context = contextvars.copy_context()
+
+    def _resolve(result: Any, error: Optional[BaseException]) -> None:
+        if future.done():
+            return  # Cancelled by the caller's timeout
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _target() -> None:
+        try:
+            outcome = (context.run(func), None)
+        except BaseException as e:
+            outcome = (None, e)
+        try:
+            loop.call_soon_threadsafe(_resolve, *outcome)
+        except RuntimeError:
+            pass  # Loop already closed: nobody is waiting for this result
+
+    threading.Thread(target=_target, name="crew-task", daemon=True).start()
+    return await future
+
+
+# Streaming LLMs report chunks on CrewAI's event bus, keyed here by the LLM's id
+_stream_writers: Dict[int, TaskStreamWriter] = {}
+
+
+@crewai_event_bus.on(LLMStreamChunkEvent)
+def _route_stream_chunk(source: Any, event: LLMStreamChunkEvent) -> None:
+    """Send a streamed chunk to the writer of the task whose LLM produced it"""
+
+    writer = _stream_writers.get(id(source))
+    if writer is not None:
+        writer.write(event.chunk)
+
 
 class IntelligentCrewRunner:
     """Runs CrewAI with dynamically generated, project-specific tasks"""
 
-    def __init__(self, max_tokens_per_chunk=180000, delay_between_chunks=65):
+    def __init__(self, max_tokens_per_chunk=180000, delay_between_chunks=65, concurrency=5, dedupe_threshold=0.95,
+                 task_timeout=900):
         self.max_tokens_per_chunk = max_tokens_per_chunk
-        self.delay_between_chunks = delay_between_chunks
-        self.task_designer = TaskDesignerAgent()
-
-    def run_intelligent_crew(self, project_idea: str, target_audience: str = "general users", timeline: str = "4 weeks") -> Dict:
-        """Run crew with intelligent task generation"""
+        self.task_timeout = task_timeout  # Seconds before a single task attempt is abandoned
+        self.dedupe_threshold = dedupe_threshold  # None disables duplicate task merging
+        self.delay_between_chunks = delay_between_chunks  # Unused: pacing comes from key_rotator
+        self.concurrency = concurrency  # Max tasks in flight at once
+        self.key_rotator = get_key_rotator()  # Per-key, per-model RPM/TPM limiters
+        self.task_designer = get_designer()  # Also warms up the pooled connection
+
+    def run_intelligent_crew(self, project_idea: str, target_audience: str = "general users", timeline: str = "4 weeks",
+                             output_dir: Optional[str] = None, run_id: Optional[str] = None,
+                             combine_results: bool = True, project_label: Optional[str] = None) -> Dict:
+        """Blocking wrapper around run_intelligent_crew_async for scripts and CLIs
+
+        task_timeout bounds this call as well: timed-out task threads are
+        daemons, so asyncio.run() does not wait for them to finish.
+        """
+        return asyncio.run(self.run_intelligent_crew_async(
+            project_idea, target_audience, timeline, output_dir=output_dir, run_id=run_id,
+            combine_results=combine_results, project_label=project_label
+        ))
+
+    async def run_intelligent_crew_async(self, project_idea: str, target_audience: str = "general users", timeline: str = "4 weeks",
+                                         output_dir: Optional[str] = None, run_id: Optional[str] = None,
+                                         combine_results: bool = True, project_label: Optional[str] = None) -> Dict:
+        """Run crew with intelligent task generation
+
+        Safe to await from a running event loop: blocking CrewAI and
+        OpenAI calls run in worker threads and all waits are asyncio sleeps.
+
+        When output_dir is given, each task's tokens are streamed to
+        task_streams_<run_id>/ and the results JSON is checkpointed after
+        every completed task, so a crash loses at most the in-flight work.
+
+        Pass combine_results=False to skip building results['combined'] and
+        stream the report with write_combined_results() instead.
+
+        project_label is what the banner shows for the project; it defaults
+        to project_idea, shortened to one line.
+        """
 
         print("🧠 INTELLIGENT CREW EXECUTION")
         print("=" * 60)
-        print(f"📊 Project: {project_idea}")
+        print(f"📊 Project: {textwrap.shorten(project_label or project_idea, width=200, placeholder='...')}")
         print(f"👥 Audience: {target_audience}")
         print(f"⏰ Timeline: {timeline}")
         print()
@@ -34,21 +238,70 @@ class IntelligentCrewRunner:
         print("🔍 PHASE 1: PROJECT ANALYSIS & TASK DESIGN")
         print("-" * 40)
 
-        analysis_result = analyze_and_design_tasks(project_idea, target_audience, timeline)
+        analysis_result = await asyncio.to_thread(analyze_and_design_tasks, project_idea, target_audience, timeline)
         custom_tasks = analysis_result['custom_tasks']
 
         print(f"✅ Generated {len(custom_tasks)} project-specific tasks")
+
+        duplicate_of: Dict[int, int] = {}
+        if self.dedupe_threshold is not None and len(custom_tasks) > 1:
+            try:
+                duplicate_of = await asyncio.to_thread(self._find_duplicates, custom_tasks)
+            except Exception as e:
+                print(f"Warning: Could not check tasks for duplicates: {e}")
+            for dup, rep in duplicate_of.items():
+                print(f"🔁 Task {dup} duplicates task {rep} - reusing its result")
         print()
 
-        # Step 2: Create a simple agent for task execution
-        from langchain_openai import ChatOpenAI
+        # Step 2: Prepare incremental output locations
+        stream_dir = None
+        checkpoint_file = None
+        if output_dir:
+            run_id = run_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+            stream_dir = f"{output_dir}/task_streams_{run_id}"
+            checkpoint_file = f"{output_dir}/game_output_{run_id}.json.zst"
+            os.makedirs(stream_dir, exist_ok=True)
+
+        # Step 3: Execute custom tasks concurrently
+        print("🛠️ PHASE 2: CONCURRENT TASK EXECUTION")
+        print("-" * 40)
 
-        llm = ChatOpenAI(
-            model=os.getenv("OPENAI_MODEL_NAME", "gpt-4o-mini"),
-            temperature=0.3
-        )
+        results = await self._execute_tasks(custom_tasks, project_idea, stream_dir, checkpoint_file, duplicate_of)
+
+        # Step 4: Combine and finalize results
+        print("🎉 PHASE 3: RESULT COMPILATION")
+        print("-" * 40)
+
+        successful_tasks = [k for k, v in results.items() if 'error' not in v]
+        failed_tasks = [k for k, v in results.items() if 'error' in v]
+
+        print(f"✅ Successful tasks: {len(successful_tasks)}")
+        print(f"❌ Failed tasks: {len(failed_tasks)}")
+
+        if successful_tasks:
+            if combine_results:
+                results['combined'] = self.combine_intelligent_results(results, analysis_result)
+                print("📄 Combined final output generated")
+            results['analysis'] = analysis_result
+        else:
+            print("⚠️ No successful tasks to combine")
+
+        return results
+
+    def _find_duplicates(self, custom_tasks: List[Dict]) -> Dict[int, int]:
+        """find_duplicate_tasks on a key with budget reserved for its one batched embeddings request"""
 
-        executor_agent = Agent(
+        tokens_est = sum(count_tokens(_dedupe_text(t), EMBEDDING_MODEL) for t in custom_tasks)
+        api_key = self.key_rotator.acquire_blocking(tokens_est, EMBEDDING_MODEL)
+        return find_duplicate_tasks(custom_tasks, self.dedupe_threshold, api_key)
+
+    def _build_executor_agent(self, api_key: Optional[str]) -> Agent:
+        """Create an executor agent whose LLM sends its requests on the given API key"""
+
+        # Retries are left to _execute_with_retry, which re-reserves budget before each one
+        llm = build_llm(EXECUTOR_MODEL, api_key, temperature=0.3, stream=True, max_retries=0)
+
+        return Agent(
             role='Expert Full Stack Developer & Game Developer',
             goal='Execute development tasks with precision, creating working, testable code',
             backstory="""You are an expert developer with deep experience in:
@@ -63,27 +316,45 @@ class IntelligentCrewRunner:
             and user interaction. You always deliver working implementations.""",
             verbose=True,
             allow_delegation=False,
+            max_retry_limit=0,
             llm=llm
         )
 
-        # Step 3: Execute custom tasks in chunks
-        print("🛠️ PHASE 2: CHUNKED TASK EXECUTION")
-        print("-" * 40)
-
-        results = {}
+    async def _execute_tasks(self, custom_tasks: List[Dict], project_idea: str,
+                             stream_dir: Optional[str] = None, checkpoint_file: Optional[str] = None,
+                             duplicate_of: Optional[Dict[int, int]] = None) -> Dict:
+        """Execute independent tasks concurrently, bounded by a semaphore
 
-        for i, task_config in enumerate(custom_tasks, 1):
-            print(f"🎯 TASK {i}/{len(custom_tasks)}: {task_config.get('name', 'Unnamed Task')}")
+        Tasks listed in duplicate_of are not executed; they receive a copy of
+        their representative task's result.
+        """
 
-            # Estimate tokens for this task
-            task_description = task_config.get('description', '')
-            estimated_tokens = len(task_description) * 4  # Rough estimation
-            print(f"📊 Estimated tokens: {estimated_tokens:,}")
+        duplicate_of = duplicate_of or {}
 
-            if estimated_tokens > self.max_tokens_per_chunk:
-                print("⚠️ Large task - may need chunking...")
+        sem = asyncio.Semaphore(self.concurrency)
+        total = len(custom_tasks)
+        completed: Dict[int, Dict] = {}
 
+        async def _run_one(i: int, task_config: Dict) -> Dict:
+            await sem.acquire()
+            abandoned: List[asyncio.Future] = []
             try:
+                print(f"🎯 TASK {i}/{total}: {task_config.get('name', 'Unnamed Task')}")
+
+                # Estimate tokens for this task
+                task_description = task_config.get('description', '')
+                estimated_tokens = count_tokens(task_description) + count_tokens(project_idea) + OUTPUT_TOKEN_BUDGET
+                print(f"📊 Estimated tokens: {estimated_tokens:,}")
+
+                if estimated_tokens > self.max_tokens_per_chunk:
+                    print("⚠️ Large task - may need chunking...")
+
+                api_key = await self.key_rotator.acquire(estimated_tokens, EXECUTOR_MODEL)
+
+                # Each task gets its own agent so streamed tokens land in its own file
+                stream_writer = TaskStreamWriter(f"{stream_dir}/task_{i}.jsonl") if stream_dir else None
+                executor_agent = self._build_executor_agent(api_key)
+
                 # Create CrewAI Task from our custom task config
                 crew_task = Task(
                     description=f"""
@@ -107,14 +378,23 @@ class IntelligentCrewRunner:
                     expected_output=task_config.get('expected_output', 'Working implementation')
                 )
 
-                # Execute the task
-                start_time = time.time()
-                print(f"⚡ Executing task...")
+                # Execute the task off the event loop so other tasks keep progressing
+                start_time = time.monotonic()
+                print(f"⚡ Executing task {i}...")
 
-                result = crew_task.execute_sync()
-                execution_time = time.time() - start_time
+                if stream_writer:
+                    _stream_writers[id(executor_agent.llm)] = stream_writer
+                try:
+                    result = await self._execute_with_retry(crew_task, api_key, estimated_tokens, abandoned)
+                finally:
+                    if stream_writer:
+                        _stream_writers.pop(id(executor_agent.llm), None)
+                        stream_writer.close()
+                execution_time = time.monotonic() - start_time
 
-                results[f"task_{i}_{task_config.get('name', 'unnamed').replace(' ', '_').lower()}"] = {
+                print(f"✅ Task {i} completed in {execution_time:.1f}s")
+
+                completed[i] = {
                     'task_config': task_config,
                     'result': result,
                     'execution_time': execution_time,
@@ -122,126 +402,182 @@ class IntelligentCrewRunner:
                     'timestamp': datetime.now().isoformat()
                 }
 
-                print(f"✅ Completed in {execution_time:.1f}s")
+                # Flush everything finished so far
+                if checkpoint_file:
+                    _write_checkpoint(checkpoint_file, self._collect_results(custom_tasks, completed))
+
+                return completed[i]
+            finally:
+                if abandoned:
+                    # A timed-out call keeps spending quota until its thread returns, so it keeps its slot
+                    abandoned[-1].add_done_callback(_release_slot)
+                else:
+                    sem.release()
 
-                # Wait between tasks (except for last one)
-                if i < len(custom_tasks):
-                    print(f"⏳ Waiting {self.delay_between_chunks}s before next task...")
-                    time.sleep(self.delay_between_chunks)
+        def _release_slot(call: asyncio.Future) -> None:
+            if not call.cancelled():
+                call.exception()  # Retrieved so asyncio doesn't log it; the task already failed
+            sem.release()
 
-            except Exception as e:
-                error_msg = str(e)
-                print(f"❌ Task failed: {error_msg}")
+        to_run = [(i, task_config) for i, task_config in enumerate(custom_tasks, 1) if i not in duplicate_of]
+        outcomes = await asyncio.gather(
+            *(_run_one(i, task_config) for i, task_config in to_run),
+            return_exceptions=True
+        )
+
+        for (i, task_config), outcome in zip(to_run, outcomes):
+            if isinstance(outcome, BaseException):
+                error_msg = str(outcome) or type(outcome).__name__  # TimeoutError has no message
+                print(f"❌ Task {i} failed: {error_msg}")
 
-                results[f"task_{i}_failed"] = {
+                completed[i] = {
                     'task_config': task_config,
                     'error': error_msg,
                     'timestamp': datetime.now().isoformat()
                 }
 
-                if "RateLimitError" in error_msg:
-                    print("🔄 Rate limit detected - increasing delay...")
-                    extra_delay = 120
-                    print(f"⏳ Waiting additional {extra_delay}s...")
-                    time.sleep(extra_delay)
+        for dup, rep in duplicate_of.items():
+            completed[dup] = {**completed[rep], 'task_config': custom_tasks[dup - 1], 'duplicate_of': rep}
 
-            print()
+        results = self._collect_results(custom_tasks, completed)
+        if checkpoint_file:
+            _write_checkpoint(checkpoint_file, results)
 
-        # Step 4: Combine and finalize results
-        print("🎉 PHASE 3: RESULT COMPILATION")
-        print("-" * 40)
-
-        successful_tasks = [k for k, v in results.items() if 'error' not in v]
-        failed_tasks = [k for k, v in results.items() if 'error' in v]
-
-        print(f"✅ Successful tasks: {len(successful_tasks)}")
-        print(f"❌ Failed tasks: {len(failed_tasks)}")
+        print()
+        return results
 
-        if successful_tasks:
-            combined_result = self.combine_intelligent_results(results, analysis_result)
-            results['combined'] = combined_result
-            results['analysis'] = analysis_result
-            print("📄 Combined final output generated")
-        else:
-            print("⚠️ No successful tasks to combine")
+    def _collect_results(self, custom_tasks: List[Dict], completed: Dict[int, Dict]) -> Dict:
+        """Key finished task entries by name, in original task order"""
 
+        results = {}
+        for i, task_config in enumerate(custom_tasks, 1):
+            if i not in completed:
+                continue
+            if 'error' in completed[i]:
+                results[f"task_{i}_failed"] = completed[i]
+            else:
+                results[f"task_{i}_{task_config.get('name', 'unnamed').replace(' ', '_').lower()}"] = completed[i]
         return results
 
+    async def _execute_with_retry(self, crew_task: Task, api_key: Optional[str], estimated_tokens: int,
+                                  abandoned: List[asyncio.Future]) -> Any:
+        """Run a task, retrying rate limit, connection and server errors with retry-after aware backoff
+
+        This is the only retry layer: the executor's SDK client and agent are
+        built not to retry, so every attempt is budgeted on the rate limiter.
+
+        A call that outlives task_timeout cannot be killed; it is appended to
+        abandoned, still running, and TimeoutError is raised.
+        """
+
+        def _before_sleep(retry_state: RetryCallState) -> None:
+            delay = retry_state.next_action.sleep if retry_state.next_action else 0
+            error = retry_state.outcome.exception() if retry_state.outcome else None
+            print(f"🔄 {type(error).__name__} (attempt {retry_state.attempt_number}) - retrying in {delay:.1f}s...")
+            if isinstance(error, RateLimitError):
+                # Hold back the other in-flight tasks on this key too
+                self.key_rotator.limiter_for(api_key, EXECUTOR_MODEL).block_for(delay)
+
+        async for attempt in AsyncRetrying(
+            retry=retry_if_exception_type((RateLimitError, APIConnectionError, InternalServerError)),
+            wait=wait_retry_after(wait_exponential_jitter(initial=1, max=60)),
+            stop=stop_after_attempt(5),
+            before_sleep=_before_sleep,
+            reraise=True
+        ):
+            if attempt.retry_state.attempt_number > 1:
+                # A retry is a new request; reserve its budget on the same key first
+                await self.key_rotator.acquire(estimated_tokens, EXECUTOR_MODEL, keys=[api_key])
+            with attempt:
+                call = asyncio.ensure_future(run_in_daemon_thread(crew_task.execute_sync))
+                try:
+                    # Shielded so a timeout leaves the call running, observable until its thread returns
+                    return await asyncio.wait_for(asyncio.shield(call), timeout=self.task_timeout)
+                except asyncio.TimeoutError:
+                    print(f"⏱️ Task call still running after {self.task_timeout}s - abandoned, its slot frees when it returns")
+                    abandoned.append(call)
+                    raise
+
     def combine_intelligent_results(self, task_results: Dict, analysis_result: Dict) -> str:
         """Combine task results with analysis information"""
 
-        combined = []
-        combined.append("# INTELLIGENT PROJECT DEVELOPMENT RESULTS")
-        combined.append(f"Generated: {datetime.now().isoformat()}")
-        combined.append("")
-        combined.append("## PROJECT ANALYSIS")
-        combined.append(str(analysis_result.get('analysis', {}).get('analysis', 'No analysis available')))
-        combined.append("")
-        combined.append("## TASK EXECUTION RESULTS")
-        combined.append("")
+        buffer = io.StringIO()
+        self.write_combined_results(buffer, task_results, analysis_result)
+        return buffer.getvalue()
+
+    def write_combined_results(self, out: TextIO, task_results: Dict, analysis_result: Dict) -> None:
+        """Stream the combined markdown report to out, one chunk at a time"""
+
+        analysis = analysis_result.get('analysis', {}).get('analysis', 'No analysis available')
+
+        out.write(_REPORT_TITLE)
+        out.write(datetime.now().isoformat())
+        out.write(_ANALYSIS_HEADING)
+        out.write(analysis if isinstance(analysis, str) else str(analysis))
+        out.write(_RESULTS_HEADING)
 
         for task_name, task_data in task_results.items():
-            if task_name in ['combined', 'analysis']:
+            if task_name in ('combined', 'analysis'):
                 continue
 
-            combined.append(f"### {task_name.replace('_', ' ').title()}")
+            out.write(f"### {task_name.replace('_', ' ').title()}\n")
 
             if 'error' in task_data:
-                combined.append(f"**Status:** Failed")
-                combined.append(f"**Error:** {task_data['error']}")
+                out.write(_STATUS_FAILED)
+                out.write(f"**Error:** {task_data['error']}\n")
             else:
-                combined.append(f"**Status:** Success")
-                combined.append(f"**Execution Time:** {task_data.get('execution_time', 0):.1f}s")
+                out.write(_STATUS_SUCCESS)
+                out.write(f"**Execution Time:** {task_data.get('execution_time', 0):.1f}s\n")
 
                 result = task_data.get('result', '')
-                if hasattr(result, 'raw'):
-                    combined.append(str(result.raw))
-                else:
-                    combined.append(str(result))
+                raw = getattr(result, 'raw', result)
+                out.write(raw if isinstance(raw, str) else str(raw))
+                out.write("\n")
 
-            combined.append("")
+            out.write("\n")
 
-        combined.append("## IMPLEMENTATION GUIDE")
-        combined.append(analysis_result.get('project_guide', 'No guide available'))
+        out.write(_GUIDE_HEADING)
+        out.write(analysis_result.get('project_guide', 'No guide available'))
 
-        return "\n".join(combined)
+@functools.lru_cache(maxsize=1)
+def get_runner(max_tokens_per_chunk=180000, delay_between_chunks=65) -> IntelligentCrewRunner:
+    """Process-wide runner, so repeat runs reuse its warm connections, limiter and designer"""
+    return IntelligentCrewRunner(max_tokens_per_chunk, delay_between_chunks)
 
 def run_project_generation(project_idea, target_audience="general users", timeline="1-2 weeks"):
     """Run project generation with intelligent task design"""
 
-    runner = IntelligentCrewRunner(
-        max_tokens_per_chunk=180000,
-        delay_between_chunks=65
-    )
+    runner = get_runner(180000, 65)
 
-    print(f"🚀 Starting project generation: {project_idea}")
-    results = runner.run_intelligent_crew(
-        project_idea=project_idea,
-        target_audience=target_audience,
-        timeline=timeline
-    )
-
-    # Save results - create directory name from project idea
+    # Output location is decided up front so results can be flushed as tasks finish
     project_name = project_idea.lower().replace(' ', '-').replace(',', '').replace('&', 'and')
     # Keep only alphanumeric, hyphens, and limit length
     project_name = ''.join(c for c in project_name if c.isalnum() or c in '-')[:50]
     output_dir = f"/Users/brettstark/Projects/{project_name}"
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-
-    # Save detailed results
-    output_file = f"{output_dir}/game_output_{timestamp}.json"
     os.makedirs(output_dir, exist_ok=True)
 
-    with open(output_file, 'w') as f:
-        json.dump(results, f, indent=2, default=str)
+    print(f"🚀 Starting project generation: {project_idea}")
+    results = runner.run_intelligent_crew(
+        project_idea=project_idea,
+        target_audience=target_audience,
+        timeline=timeline,
+        output_dir=output_dir,
+        run_id=timestamp,
+        combine_results=False  # Streamed straight to disk below
+    )
+
+    # Save detailed results
+    output_file = f"{output_dir}/game_output_{timestamp}.json.zst"
+    _write_json_atomic(output_file, results)
 
     print(f"💾 Detailed results saved to: {output_file}")
 
-    # Save combined markdown
-    if 'combined' in results:
+    # Save combined markdown, written section by section rather than built in memory
+    if 'analysis' in results:
         combined_file = f"{output_dir}/game_output_{timestamp}_combined.md"
         with open(combined_file, 'w') as f:
-            f.write(results['combined'])
+            runner.write_combined_results(f, results, results['analysis'])
         print(f"📄 Combined output: {combined_file}")
 
     # Save project guide
@@ -280,7 +616,7 @@ if __name__ == "__main__":
     result = run_project_generation(project_idea, target_audience, timeline)
     print(f"\n🎉 PROJECT GENERATION COMPLETE: {project_idea}")
 
-    if 'combined' in result:
+    if 'analysis' in result:
         print("✅ Successfully generated project with custom tasks")
     else:
         print("⚠️ Generation completed with some issues - check output files")
\ No newline at end of file
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+LLM Cache - Response caching for repeated designer prompts
+Serves identical (model, temperature, prompt) calls from disk instead of the API
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+import zstandard as zstd
+from langchain_core.caches import BaseCache
+from langchain_core.outputs import Generation
+from pydantic import BaseModel, ValidationError
+
+from openai_client import API_KEYS, PooledOpenAILLM, get_http_client
+
+F = TypeVar('F', bound=Callable[..., Any])
+T = TypeVar('T')
+
+CACHE_DIR = os.path.expanduser(os.getenv("INTELLIGENT_CREW_CACHE_DIR", "~/.cache/intelligent_crew"))
+_TTL_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Cached results and result JSON are highly repetitive; level 6 trades little speed for ~5-10x smaller files
+ZSTD_LEVEL = 6
+
+
+def _hash(prompt: str, llm_string: str) -> str:
+    """Deterministic key for a prompt; llm_string already encodes model and temperature"""
+    return hashlib.sha256(f"{llm_string}\n{prompt}".encode()).hexdigest()
+
+
+class SingleFlight:
+    """Lets concurrent identical calls share one execution and its outcome
+
+    The first caller for a key runs the function; later callers wait on its
+    future. The key is dropped as soon as the call finishes, whether it
+    returned or raised, so nothing is left waiting on a failed call.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, Future] = {}
+        self._guard = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        with self._guard:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._guard:
+                del self._calls[key]
+
+
+_in_flight = SingleFlight()
+
+
+class CachedOpenAILLM(PooledOpenAILLM):
+    """PooledOpenAILLM that serves repeated (model, temperature, messages) calls from the response cache"""
+
+    def call(self, messages: Any, tools: Optional[List[Dict[str, Any]]] = None, callbacks: Optional[List[Any]] = None,
+             available_functions: Optional[Dict[str, Any]] = None, from_task: Any = None, from_agent: Any = None,
+             response_model: Optional[type[BaseModel]] = None) -> Any:
+
+        def _call() -> Any:
+            return super(CachedOpenAILLM, self).call(messages, tools, callbacks, available_functions,
+                                                     from_task, from_agent, response_model)
+
+        cache = get_llm_cache()
+        if cache is None or tools:
+            return _call()  # Tool calls have side effects and are never replayed
+
+        prompt = json.dumps(messages, sort_keys=True, default=str)
+        schema = response_model.__name__ if response_model else ''
+        llm_string = f"{self.model}|{self.temperature}|{schema}"
+
+        def _lookup_or_call() -> Any:
+            cached = cache.lookup(prompt, llm_string)
+            if cached:
+                text = cached[0].text
+                if response_model is None:
+                    return text
+                try:
+                    return response_model.model_validate_json(text)
+                except ValidationError:
+                    return text
+
+            result = _call()
+            # Structured output comes back parsed; store it as its JSON
+            if isinstance(result, BaseModel):
+                cache.update(prompt, llm_string, [Generation(text=result.model_dump_json())])
+            elif isinstance(result, str):
+                cache.update(prompt, llm_string, [Generation(text=result)])
+            return result
+
+        # Concurrent identical prompts wait for one API call instead of each missing
+        return _in_flight.do(_hash(prompt, llm_string), _lookup_or_call)
+
+
+@functools.lru_cache(maxsize=1)
+def get_llm_cache() -> Optional[BaseCache]:
+    """Process-wide response store used by CachedOpenAILLM, set up from the environment on first use
+
+    Nothing is opened or created at import time, only once a cached LLM
+    actually makes a call.
+    """
+
+    if os.getenv("LLM_CACHE", "on").lower() in ("off", "0", "false"):
+        return None
+
+    redis_url = os.getenv("LLM_CACHE_REDIS_URL")
+    if redis_url:
+        # Semantic cache: paraphrased project ideas still hit
+        from langchain_community.cache import RedisSemanticCache
+        from langchain_openai import OpenAIEmbeddings
+
+        return RedisSemanticCache(
+            redis_url=redis_url,
+            embedding=OpenAIEmbeddings(api_key=API_KEYS[0], http_client=get_http_client()),
+            score_threshold=float(os.getenv("LLM_CACHE_SCORE_THRESHOLD", "0.05"))
+        )
+
+    from langchain_community.cache import SQLiteCache
+
+    return SQLiteCache(database_path=os.getenv("LLM_CACHE_PATH", ".llm_cache.db"))
+
+
+def _parse_ttl(ttl: str) -> float:
+    """Parse a TTL such as "30m", "12h" or "7d" into seconds"""
+    return float(ttl[:-1]) * _TTL_UNITS[ttl[-1]] if ttl[-1] in _TTL_UNITS else float(ttl)
+
+
+def disk_cached(ttl: str = "7d", tag: str = "v1",
+                should_cache: Optional[Callable[[Any], bool]] = None) -> Callable[[F], F]:
+    """Cache a function's result on disk, keyed by SHA256 of its arguments and tag
+
+    Bump the tag whenever the prompts behind the function change so stale
+    results are never served. Results for which should_cache returns False
+    are returned but not written, so degraded answers are not kept for a TTL.
+    """
+
+    max_age = _parse_ttl(ttl)
+
+    def decorator(func: F) -> F:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            payload = json.dumps([func.__qualname__, tag, bound.arguments], sort_keys=True, default=str)
+            cache_file = os.path.join(CACHE_DIR, f"{hashlib.sha256(payload.encode()).hexdigest()}.pkl.zst")
+
+            try:
+                if time.time() - os.path.getmtime(cache_file) < max_age:
+                    with open(cache_file, 'rb') as f:
+                        data = zstd.ZstdDecompressor().decompress(f.read())
+                    result = pickle.loads(data)  # Written only by this process's user
+                    print(f"⚡ Using cached {func.__name__} result ({tag})")
+                    return result
+            except (OSError, pickle.UnpicklingError, EOFError, zstd.ZstdError,
+                    AttributeError, ImportError, IndexError, TypeError, ValueError):
+                pass  # Missing, expired, corrupt or no-longer-loadable entries are recomputed
+
+            result = func(*args, **kwargs)
+            if should_cache is not None and not should_cache(result):
+                return result
+
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(zstd.ZstdCompressor(level=ZSTD_LEVEL).compress(pickle.dumps(result)))
+                os.replace(tmp_path, cache_file)
+            except (OSError, pickle.PicklingError, TypeError) as e:
+                print(f"Warning: Could not write {func.__name__} cache: {e}")
+
+            return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+OpenAI Client - Shared, pooled HTTP transport for every CrewAI LLM
+Keeps TCP/TLS connections alive so each call skips a fresh handshake, and
+rotates requests across API keys to raise the effective RPM/TPM ceiling
+"""
+
+import asyncio
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import tiktoken
+from crewai.llms.providers.openai.completion import OpenAICompletion
+from openai import OpenAI
+
+from rate_limiter import RateLimiter
+
+# Per-role models: a small one for analysis, a stronger one for code generation.
+# OPENAI_MODEL_NAME still pins both roles to one model when they are not set.
+ANALYZER_MODEL = os.getenv("ANALYZER_MODEL") or os.getenv("OPENAI_MODEL_NAME") or "gpt-4o-mini"
+EXECUTOR_MODEL = os.getenv("EXECUTOR_MODEL") or os.getenv("OPENAI_MODEL_NAME") or "gpt-4o"
+
+
+def _request_model(request: httpx.Request) -> Optional[str]:
+    """Model named in an API request's JSON body, if any"""
+
+    try:
+        body = json.loads(request.content or b"null")
+    except (httpx.RequestNotRead, ValueError):
+        return None
+    model = body.get("model") if isinstance(body, dict) else None
+    return model if isinstance(model, str) else None
+
+
+def _record_rate_limits(response: httpx.Response) -> None:
+    """Feed each response's x-ratelimit-* headers into the limiter for its (API key, model)
+
+    OpenAI sets rate limits per model, so an embeddings response must not
+    retune or block the limiter that paces chat calls on the same key.
+    """
+
+    auth = response.request.headers.get("authorization", "")
+    api_key = auth[len("Bearer "):] if auth.startswith("Bearer ") else None
+    model = _request_model(response.request)
+    rotator = get_key_rotator()
+    if model and api_key in rotator.api_keys:
+        rotator.limiter_for(api_key, model).update_from_headers(response.headers)
+
+
+# One pool per process, shared by the designer and executor LLMs
+_http_client = httpx.Client(
+    limits=httpx.Limits(max_keepalive_connections=16, max_connections=32, keepalive_expiry=60),
+    timeout=httpx.Timeout(60.0, connect=10.0),
+    http2=True,
+    # Sees every response, including streamed ones and 429s, before the SDK does
+    event_hooks={"response": [_record_rate_limits]}
+)
+
+
+def _load_api_keys() -> List[Optional[str]]:
+    """Keys from OPENAI_API_KEYS (comma-separated), else the single OPENAI_API_KEY"""
+
+    keys = [key.strip() for key in os.getenv("OPENAI_API_KEYS", "").split(",") if key.strip()]
+    return keys or [os.getenv("OPENAI_API_KEY")]
+
+
+API_KEYS = _load_api_keys()
+
+
+def get_http_client() -> httpx.Client:
+    """Return the process-wide pooled HTTP client"""
+    return _http_client
+
+
+@functools.lru_cache(maxsize=None)
+def _load_encoder(model: str) -> tiktoken.Encoding:
+    """Load the BPE encoder for a model, falling back to the current default"""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str = EXECUTOR_MODEL) -> int:
+    """Exact token count for text under the given model's encoding"""
+    return len(_load_encoder(model).encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = EXECUTOR_MODEL) -> str:
+    """Cut text down to max_tokens tokens, marking how much was dropped"""
+
+    encoder = _load_encoder(model)
+    tokens = encoder.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return f"{encoder.decode(tokens[:max_tokens])}\n... [truncated {len(tokens) - max_tokens:,} tokens]"
+
+
+class PooledOpenAILLM(OpenAICompletion):
+    """CrewAI's native OpenAI LLM, sending its requests over the shared pool
+
+    CrewAI rebuilds LangChain chat models from a handful of fields and drops
+    any custom http_client, so the pool has to be wired in at this level.
+    """
+
+    def _build_sync_client(self) -> OpenAI:
+        return OpenAI(**self._get_client_params(), http_client=_http_client)
+
+
+def build_llm(model: str, api_key: Optional[str], **kwargs: Any) -> PooledOpenAILLM:
+    """CrewAI LLM for the given model and API key, on the pooled transport"""
+    return PooledOpenAILLM(model=model, api_key=api_key, **kwargs)
+
+
+class KeyRotator:
+    """Spreads calls over several API keys, tracking each (key, model) pair with its own RateLimiter"""
+
+    def __init__(self, api_keys: List[Optional[str]], rpm: int, tpm: int):
+        self.api_keys = list(api_keys)
+        self.rpm = rpm
+        self.tpm = tpm
+        self.limiters: Dict[Tuple[Optional[str], str], RateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def limiter_for(self, api_key: Optional[str], model: str) -> RateLimiter:
+        """Limiter for one key's quota on one model, created on first use"""
+
+        with self._lock:
+            limiter = self.limiters.get((api_key, model))
+            if limiter is None:
+                limiter = self.limiters[(api_key, model)] = RateLimiter(rpm=self.rpm, tpm=self.tpm)
+            return limiter
+
+    def _try_acquire(self, tokens_est: int, model: str,
+                     keys: Optional[List[Optional[str]]] = None) -> Tuple[Optional[str], float]:
+        """Reserve budget on the least-loaded key that fits, else return the shortest wait"""
+
+        limiters = {key: self.limiter_for(key, model) for key in (self.api_keys if keys is None else keys)}
+        ranked = sorted(limiters, key=lambda key: limiters[key].remaining_tokens(), reverse=True)
+        waits = []
+        for key in ranked:
+            wait = limiters[key].try_acquire(tokens_est)
+            if wait <= 0:
+                return key, 0.0
+            waits.append(wait)
+
+        wait = min(waits)
+        print(f"⏳ Rate limit budget reached on all {len(ranked)} key(s) - waiting {wait:.1f}s...")
+        return None, wait
+
+    async def acquire(self, tokens_est: int, model: str, keys: Optional[List[Optional[str]]] = None) -> Optional[str]:
+        """Reserve budget on the least-loaded key for the model, waiting only if every key is exhausted
+
+        Pass keys to choose among a subset, e.g. to stay on the key a call is already using.
+        """
+
+        while True:
+            key, wait = self._try_acquire(tokens_est, model, keys)
+            if wait <= 0:
+                return key
+            await asyncio.sleep(wait)
+
+    def acquire_blocking(self, tokens_est: int, model: str) -> Optional[str]:
+        """acquire() for callers already running in a worker thread"""
+
+        while True:
+            key, wait = self._try_acquire(tokens_est, model)
+            if wait <= 0:
+                return key
+            time.sleep(wait)
+
+
+@functools.lru_cache(maxsize=1)
+def get_key_rotator() -> KeyRotator:
+    """Process-wide rotator shared by the designer and the executor"""
+    return KeyRotator(
+        API_KEYS,
+        rpm=int(os.getenv("OPENAI_RPM_LIMIT", "500")),
+        tpm=int(os.getenv("OPENAI_TPM_LIMIT", "200000"))
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def warm_up_connection() -> None:
+    """Open a connection in the pool PooledOpenAILLM sends through, once per process
+
+    Runs in the background so the TCP/TLS handshake overlaps with agent
+    setup instead of delaying the first chat request.
+    """
+
+    base_url = os.getenv("OPENAI_BASE_URL") or os.getenv("OPENAI_API_BASE") or "https://api.openai.com/v1"
+    # Any configured key will do, so OPENAI_API_KEYS-only setups authenticate too
+    headers = {"Authorization": f"Bearer {API_KEYS[0]}"} if API_KEYS[0] else {}
+
+    def _head() -> None:
+        try:
+            _http_client.head(f"{base_url.rstrip('/')}/models", headers=headers)
+        except httpx.HTTPError:
+            pass  # Warm-up is best effort; the first real call will connect instead
+
+    threading.Thread(target=_head, daemon=True).start()
@@ -6,8 +6,62 @@ Uses the intelligent system to enhance generated projects
 
 import sys
 import os
+from typing import Dict, Tuple
 from task_designer_agent import TaskDesignerAgent, analyze_and_design_tasks
-from intelligent_crew_runner import IntelligentCrewRunner
+from intelligent_crew_runner import get_runner
+from openai_client import count_tokens, truncate_to_tokens
+
+PROJECT_FILE_EXTENSIONS = ('.html', '.js', '.css')
+
+# The inlined source is repeated in every task prompt, so it is capped per file and in total
+FILE_TOKEN_LIMIT = 4000
+SOURCE_TOKEN_BUDGET = 12000
+
+# path -> (mtime_ns, size, content); unchanged files are not re-read
+_file_cache: Dict[str, Tuple[int, int, str]] = {}
+
+def read_project_files(project_path: str) -> Dict[str, str]:
+    """Read the project's source files, reusing cached contents for unchanged files"""
+
+    project_files = {}
+    if not os.path.exists(project_path):
+        return project_files
+
+    with os.scandir(project_path) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            if not entry.name.endswith(PROJECT_FILE_EXTENSIONS) or not entry.is_file():
+                continue
+
+            stat = entry.stat()
+            cached = _file_cache.get(entry.path)
+            if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                project_files[entry.name] = cached[2]
+                continue
+
+            with open(entry.path, 'r') as f:
+                content = f.read()
+            _file_cache[entry.path] = (stat.st_mtime_ns, stat.st_size, content)
+            project_files[entry.name] = content
+
+    return project_files
+
+def format_project_sources(project_files: Dict[str, str]) -> str:
+    """Inline project files for the prompt, truncating or omitting what exceeds the token caps"""
+
+    sections = []
+    omitted = []
+    budget = SOURCE_TOKEN_BUDGET
+    for name, content in project_files.items():
+        if budget <= 0:
+            omitted.append(name)
+            continue
+        content = truncate_to_tokens(content, min(FILE_TOKEN_LIMIT, budget))
+        budget -= count_tokens(content)
+        sections.append(f"--- {name} ---\n{content}")
+
+    if omitted:
+        sections.append(f"--- Not shown (source token budget reached): {', '.join(omitted)} ---")
+    return "\n".join(sections)
 
 def improve_project(project_path, improvement_request, target_audience="general users"):
     """Improve an existing project based on user feedback"""
@@ -19,13 +73,8 @@ def improve_project(project_path, improvement_request, target_audience="general
     print()
 
     # Read existing project files
-    project_files = {}
-    if os.path.exists(project_path):
-        for file in os.listdir(project_path):
-            if file.endswith(('.html', '.js', '.css')):
-                file_path = os.path.join(project_path, file)
-                with open(file_path, 'r') as f:
-                    project_files[file] = f.read()
+    project_files = read_project_files(project_path)
+    file_sections = format_project_sources(project_files)
 
     # Create improvement-focused project description
     project_context = f"""
@@ -35,18 +84,22 @@ def improve_project(project_path, improvement_request, target_audience="general
 
     Improvement Request: {improvement_request}
 
+    Current Source:
+{file_sections}
+
     Instructions: Analyze the existing code and implement the requested improvements.
     Focus on enhancing the existing functionality rather than rebuilding from scratch.
     Maintain compatibility with the current project structure.
     """
 
-    # Use intelligent system for improvements
-    runner = IntelligentCrewRunner(max_tokens_per_chunk=180000, delay_between_chunks=65)
+    # Use intelligent system for improvements (shared across calls in this process)
+    runner = get_runner(180000, 65)
 
     results = runner.run_intelligent_crew(
         project_idea=project_context,
         target_audience=target_audience,
-        timeline="3-5 days"
+        timeline="3-5 days",
+        project_label=f"Improve {os.path.basename(os.path.normpath(project_path))}: {improvement_request}"
     )
 
     return results
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter - Rolling-window request/token budget for OpenAI calls
+Paces work against the real RPM/TPM quota instead of sleeping a fixed delay
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from tenacity import RetryCallState
+from tenacity.wait import wait_base
+
+# OpenAI reset headers look like "1s", "6m0s", "20ms" or "0.5s"
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_UNITS = {'h': 3600.0, 'm': 60.0, 's': 1.0, 'ms': 0.001}
+
+
+def _parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse an OpenAI reset duration header into seconds"""
+
+    if not value:
+        return None
+
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def _parse_retry_after_value(value: Optional[str]) -> Optional[float]:
+    """Parse a retry-after header given as seconds or as an HTTP-date"""
+
+    if not value:
+        return None
+
+    seconds = _parse_duration(value)
+    if seconds is not None:
+        return seconds
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def parse_retry_after(exc: Optional[BaseException]) -> Optional[float]:
+    """Seconds the server asked us to wait, read from a rate limit error's response"""
+
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+
+    retry_after = _parse_retry_after_value(headers.get('retry-after'))
+    if retry_after is not None:
+        return retry_after
+
+    resets = [
+        _parse_duration(headers.get(f'x-ratelimit-reset-{kind}'))
+        for kind in ('requests', 'tokens')
+    ]
+    resets = [reset for reset in resets if reset is not None]
+    return max(resets) if resets else None
+
+
+class wait_retry_after(wait_base):
+    """Tenacity wait that honours retry-after headers, else defers to a fallback"""
+
+    def __init__(self, fallback: wait_base, max_wait: float = 60.0):
+        self.fallback = fallback
+        self.max_wait = max_wait
+
+    def __call__(self, retry_state: RetryCallState) -> float:
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        delay = parse_retry_after(exc)
+        if delay is None:
+            return self.fallback(retry_state)
+        return min(delay, self.max_wait)
+
+
+class RateLimiter:
+    """Tracks requests and tokens per minute across a rolling window"""
+
+    def __init__(self, rpm: int = 500, tpm: int = 200000, window: float = 60.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = window
+        self._requests: Deque[Tuple[float, int]] = deque()
+        self._tokens: Deque[Tuple[float, int]] = deque()
+        self._blocked_until = 0.0
+        # Plain lock: header updates arrive from worker threads, not the event loop
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens_est: int) -> float:
+        """Record the request if it fits, otherwise return seconds to wait"""
+
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+
+            self._expire(now)
+
+            if len(self._requests) >= self.rpm:
+                return self._requests[0][0] + self.window - now
+
+            used_tokens = sum(count for _, count in self._tokens)
+            # An oversized request is still let through once the window is empty
+            if self._tokens and used_tokens + tokens_est > self.tpm:
+                return self._tokens[0][0] + self.window - now
+
+            self._requests.append((now, 1))
+            self._tokens.append((now, tokens_est))
+            return 0.0
+
+    def remaining_tokens(self) -> int:
+        """Tokens still available in the current window (0 while blocked)"""
+
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            if now < self._blocked_until or len(self._requests) >= self.rpm:
+                return 0
+            return max(self.tpm - sum(count for _, count in self._tokens), 0)
+
+    def _expire(self, now: float) -> None:
+        """Drop entries that have left the rolling window"""
+
+        cutoff = now - self.window
+        for entries in (self._requests, self._tokens):
+            while entries and entries[0][0] <= cutoff:
+                entries.popleft()
+
+    def block_for(self, seconds: float) -> None:
+        """Pause all new requests for the given number of seconds"""
+
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers: Dict[str, Any]) -> None:
+        """Re-tune the limiter from x-ratelimit-* / retry-after response headers"""
+
+        headers = {str(k).lower(): v for k, v in headers.items()}
+
+        limit_requests = headers.get('x-ratelimit-limit-requests')
+        limit_tokens = headers.get('x-ratelimit-limit-tokens')
+        if limit_requests and str(limit_requests).isdigit():
+            self.rpm = int(limit_requests)
+        if limit_tokens and str(limit_tokens).isdigit():
+            self.tpm = int(limit_tokens)
+
+        retry_after = _parse_retry_after_value(headers.get('retry-after'))
+        if retry_after:
+            self.block_for(retry_after)
+            return
+
+        # Quota exhausted: hold off until the server says it resets
+        for kind in ('requests', 'tokens'):
+            remaining = headers.get(f'x-ratelimit-remaining-{kind}')
+            reset = _parse_duration(headers.get(f'x-ratelimit-reset-{kind}'))
+            if remaining is not None and str(remaining) == '0' and reset:
+                self.block_for(reset)
+
@@ -4,63 +4,26 @@ Task Designer Agent - Analyzes project requirements and generates appropriate ta
 This is the missing piece that determines WHAT needs to be built before HOW to build it
 """
 
+import functools
+import re
 from crewai import Agent, Task
-from langchain_openai import ChatOpenAI
-import os
+from pydantic import BaseModel
 import json
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
+from llm_cache import CachedOpenAILLM, disk_cached
+from openai_client import ANALYZER_MODEL, EXECUTOR_MODEL, PooledOpenAILLM, count_tokens, get_key_rotator, warm_up_connection
 
-class TaskDesignerAgent:
-    """Analyzes projects and generates appropriate development tasks"""
-
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            model=os.getenv("OPENAI_MODEL_NAME", "gpt-4o-mini"),
-            temperature=0.1  # Very low for consistent analysis
-        )
-
-        self.analyzer_agent = Agent(
-            role='Senior Technical Project Analyzer',
-            goal='Analyze project requirements and determine the optimal development approach and task structure',
-            backstory="""You are a senior technical analyst with 15+ years experience across
-            web development, game development, mobile apps, AI/ML projects, and enterprise software.
-            You excel at quickly understanding project requirements and determining:
-            - What type of project this is (game, web app, mobile app, AI tool, etc.)
-            - What technology stack is most appropriate
-            - What development phases and tasks are needed
-            - What potential challenges and requirements exist
-
-            SPECIAL EXPERTISE: You understand common failure patterns and their prevention:
-
-            GAMES: Memory leaks from uncleaned intervals/requestAnimationFrame, audio lifecycle issues,
-            input event cleanup, mobile browser quirks, canvas rendering problems, game state corruption
-
-            WEB APPS: Form validation bypasses, authentication flow breaks, API integration failures,
-            XSS vulnerabilities, responsive design issues, accessibility problems
+# Bump whenever the analysis/task prompts change to invalidate cached designs
+TEMPLATE_VERSION = "analyze-v3"
 
-            MOBILE: Touch event conflicts, orientation handling, device integration failures,
-            platform-specific behaviors, performance on lower-end devices
+# Fewer designed tasks than this is treated as a weak answer and escalated
+MIN_DESIGNED_TASKS = 3
 
-            AI TOOLS: Model loading failures, rate limiting issues, input/output validation problems,
-            fallback mechanism absence, user experience during processing delays
+# Reserved for the designer's reply (analysis plus task list) when budgeting tokens
+DESIGN_OUTPUT_BUDGET = 4096
 
-            You create detailed project analysis that guides the entire development process.""",
-            verbose=True,
-            allow_delegation=False,
-            llm=self.llm
-        )
-
-    def analyze_project(self, project_idea: str, target_audience: str = "general users", timeline: str = "8 weeks") -> Dict:
-        """Analyze project and determine development approach"""
-
-        analysis_task = Task(
-            description=f"""Analyze this project idea and create a comprehensive project analysis:
-
-            PROJECT: {project_idea}
-            TARGET AUDIENCE: {target_audience}
-            TIMELINE: {timeline}
-
-            Provide a detailed analysis covering:
+# Shared prompt sections for the two-pass and single-pass designer calls
+ANALYSIS_SECTIONS = """Provide a detailed analysis covering:
 
             1. PROJECT TYPE CLASSIFICATION:
                - Is this a game, web application, mobile app, AI tool, or other?
@@ -96,31 +59,9 @@ class TaskDesignerAgent:
                - What are the common pitfalls for this type of project?
                - What should be prioritized to ensure a working result?
 
-            Format your response as a detailed analysis that will guide task creation.""",
-            agent=self.analyzer_agent,
-            expected_output="Comprehensive project analysis with technology recommendations, development approach, and detailed task breakdown recommendations"
-        )
-
-        result = analysis_task.execute_sync()
-        return {
-            'analysis': result,
-            'project_idea': project_idea,
-            'target_audience': target_audience,
-            'timeline': timeline
-        }
-
-    def generate_custom_tasks(self, analysis_result: Dict) -> List[Dict]:
-        """Generate custom tasks based on project analysis"""
-
-        task_generation = Task(
-            description=f"""Based on this project analysis, create specific development tasks:
-
-            ANALYSIS RESULTS:
-            {analysis_result['analysis']}
-
-            PROJECT: {analysis_result['project_idea']}
+"""
 
-            Create a detailed list of development tasks that will result in a WORKING implementation.
+TASK_GUIDELINES = """Create a detailed list of development tasks that will result in a WORKING implementation.
             Each task should be:
             - Specific and actionable
             - Focused on creating working code/features
@@ -170,14 +111,192 @@ class TaskDesignerAgent:
             • "Code Quality & Maintainability": Clean code structure, commented critical sections, consistent patterns
             • "Final Integration Testing": End-to-end user workflows, edge case handling, production readiness
 
-            Ensure tasks will result in a WORKING, TESTABLE implementation that matches the project requirements.
+            Ensure tasks will result in a WORKING, TESTABLE implementation that matches the project requirements."""
+
+class TaskSpec(BaseModel):
+    """One development task produced by the designer"""
+    name: str
+    description: str
+    expected_output: str
+    success_criteria: str
+    dependencies: List[str] = []
+    estimated_complexity: str = "Medium"
 
-            Format as a JSON array of task objects.""",
-            agent=self.analyzer_agent,
-            expected_output="JSON array of custom development tasks specific to the project type and requirements"
+
+class TaskList(BaseModel):
+    """Structured output schema for task generation"""
+    tasks: List[TaskSpec]
+
+
+class ProjectPlan(BaseModel):
+    """Structured output schema for the combined analysis + task design call"""
+    analysis: str
+    tasks: List[TaskSpec]
+
+
+class TaskDesignerAgent:
+    """Analyzes projects and generates appropriate development tasks"""
+
+    def __init__(self):
+        # Phase 1 sends the first request of a run, so start the handshake now
+        warm_up_connection()
+
+    def _agent_for(self, model: str, description: str) -> Agent:
+        """Analyzer agent on the given model, bound to a key with budget reserved for the prompt
+
+        ANALYZER_MODEL handles routine analysis; EXECUTOR_MODEL is the escalation path.
+        Blocks while every key is out of budget, so call it from a worker thread.
+        A fresh agent is built per call: CrewAI agents keep per-execution state,
+        so one shared designer must not hand the same agent to concurrent runs.
+        """
+
+        tokens_est = count_tokens(description, model) + DESIGN_OUTPUT_BUDGET
+        api_key = get_key_rotator().acquire_blocking(tokens_est, model)
+
+        llm = CachedOpenAILLM(model=model, api_key=api_key, temperature=0.1)  # Very low for consistent analysis
+        return self._build_analyzer_agent(llm)
+
+    def _build_analyzer_agent(self, llm: PooledOpenAILLM) -> Agent:
+        """Create the project analyzer agent backed by the given model"""
+
+        return Agent(
+            role='Senior Technical Project Analyzer',
+            goal='Analyze project requirements and determine the optimal development approach and task structure',
+            backstory="""You are a senior technical analyst with 15+ years experience across
+            web development, game development, mobile apps, AI/ML projects, and enterprise software.
+            You excel at quickly understanding project requirements and determining:
+            - What type of project this is (game, web app, mobile app, AI tool, etc.)
+            - What technology stack is most appropriate
+            - What development phases and tasks are needed
+            - What potential challenges and requirements exist
+
+            SPECIAL EXPERTISE: You understand common failure patterns and their prevention:
+
+            GAMES: Memory leaks from uncleaned intervals/requestAnimationFrame, audio lifecycle issues,
+            input event cleanup, mobile browser quirks, canvas rendering problems, game state corruption
+
+            WEB APPS: Form validation bypasses, authentication flow breaks, API integration failures,
+            XSS vulnerabilities, responsive design issues, accessibility problems
+
+            MOBILE: Touch event conflicts, orientation handling, device integration failures,
+            platform-specific behaviors, performance on lower-end devices
+
+            AI TOOLS: Model loading failures, rate limiting issues, input/output validation problems,
+            fallback mechanism absence, user experience during processing delays
+
+            You create detailed project analysis that guides the entire development process.""",
+            verbose=True,
+            allow_delegation=False,
+            llm=llm
+        )
+
+    def analyze_project(self, project_idea: str, target_audience: str = "general users", timeline: str = "8 weeks") -> Dict:
+        """Analyze project and determine development approach"""
+
+        description = f"""Analyze this project idea and create a comprehensive project analysis:
+
+            PROJECT: {project_idea}
+            TARGET AUDIENCE: {target_audience}
+            TIMELINE: {timeline}
+
+            {ANALYSIS_SECTIONS}
+            Format your response as a detailed analysis that will guide task creation."""
+
+        analysis_task = Task(
+            description=description,
+            agent=self._agent_for(ANALYZER_MODEL, description),
+            expected_output="Comprehensive project analysis with technology recommendations, development approach, and detailed task breakdown recommendations"
+        )
+
+        result = analysis_task.execute_sync()
+        return {
+            'analysis': result,
+            'project_idea': project_idea,
+            'target_audience': target_audience,
+            'timeline': timeline
+        }
+
+    def generate_custom_tasks(self, analysis_result: Dict) -> List[Dict]:
+        """Generate custom tasks based on project analysis"""
+        return self._design_tasks(analysis_result)[0]
+
+    def _design_tasks(self, analysis_result: Dict) -> Tuple[List[Dict], bool]:
+        """Custom tasks for the analysis, and whether they came from structured output"""
+
+        result = self._execute_with_escalation(
+            description=f"""Based on this project analysis, create specific development tasks:
+
+            ANALYSIS RESULTS:
+            {analysis_result['analysis']}
+
+            PROJECT: {analysis_result['project_idea']}
+
+            {TASK_GUIDELINES}""",
+            expected_output="Custom development tasks specific to the project type and requirements",
+            output_pydantic=TaskList
         )
 
-        result = task_generation.execute_sync()
+        # Structured output parses on the first try in the normal case
+        if getattr(result, 'pydantic', None) is not None:
+            return [spec.model_dump() for spec in result.pydantic.tasks], True
+
+        return self._parse_unstructured_tasks(result), False
+
+    def analyze_and_design_combined(self, project_idea: str, target_audience: str = "general users", timeline: str = "8 weeks") -> Dict:
+        """Analyze the project and design its tasks in a single LLM call
+
+        'structured' in the returned dict is False when the model ignored the
+        schema and the tasks had to be recovered by the fallback parser.
+        """
+
+        result = self._execute_with_escalation(
+            description=f"""Analyze this project idea and design its development tasks in one pass:
+
+            PROJECT: {project_idea}
+            TARGET AUDIENCE: {target_audience}
+            TIMELINE: {timeline}
+
+            PART 1 - PROJECT ANALYSIS (the `analysis` field):
+
+            {ANALYSIS_SECTIONS}
+            PART 2 - DEVELOPMENT TASKS (the `tasks` field), based on your analysis:
+
+            {TASK_GUIDELINES}""",
+            expected_output="Comprehensive project analysis plus custom development tasks specific to the project type and requirements",
+            output_pydantic=ProjectPlan
+        )
+
+        plan = getattr(result, 'pydantic', None)
+        if plan is not None:
+            analysis_text = plan.analysis
+            custom_tasks = [spec.model_dump() for spec in plan.tasks]
+        else:
+            analysis_text = result.raw if hasattr(result, 'raw') else str(result)
+            custom_tasks = self._parse_unstructured_tasks(result)
+
+        analysis = {
+            'analysis': analysis_text,
+            'project_idea': project_idea,
+            'target_audience': target_audience,
+            'timeline': timeline
+        }
+        return {'analysis': analysis, 'custom_tasks': custom_tasks, 'structured': plan is not None}
+
+    def _execute_with_escalation(self, **task_kwargs: Any) -> Any:
+        """Run a structured task on the analyzer model, retrying on the executor model if the answer is weak"""
+
+        description = task_kwargs['description']
+        result = Task(agent=self._agent_for(ANALYZER_MODEL, description), **task_kwargs).execute_sync()
+
+        structured = getattr(result, 'pydantic', None)
+        if ANALYZER_MODEL == EXECUTOR_MODEL or (structured is not None and len(structured.tasks) >= MIN_DESIGNED_TASKS):
+            return result
+
+        print(f"⚠️ Weak task design from {ANALYZER_MODEL} - escalating to {EXECUTOR_MODEL}...")
+        return Task(agent=self._agent_for(EXECUTOR_MODEL, description), **task_kwargs).execute_sync()
+
+    def _parse_unstructured_tasks(self, result: Any) -> List[Dict]:
+        """Last-resort parsing when the model ignored the structured output schema"""
 
         try:
             # Try to parse as JSON
@@ -187,7 +306,6 @@ class TaskDesignerAgent:
                 task_data = str(result)
 
             # Extract JSON from the response
-            import re
             json_match = re.search(r'\[.*\]', task_data, re.DOTALL)
             if json_match:
                 tasks = json.loads(json_match.group())
@@ -303,21 +421,44 @@ Total Tasks: {len(custom_tasks)}
 
         return guide
 
-def analyze_and_design_tasks(project_idea: str, target_audience: str = "general users", timeline: str = "8 weeks") -> Dict:
-    """Main function to analyze project and generate custom tasks"""
+@functools.lru_cache(maxsize=1)
+def get_designer() -> TaskDesignerAgent:
+    """Process-wide TaskDesignerAgent, shared by every run in this process"""
+    return TaskDesignerAgent()
+
+def _is_structured_design(result: Dict) -> bool:
+    """Only designs parsed from structured output are worth caching; fallback parses are retried next run"""
+    return result.get('structured_output', False)
+
+# Escalation can hand the design to EXECUTOR_MODEL, so both models key the cache
+@disk_cached(ttl="7d", tag=f"{TEMPLATE_VERSION}-{ANALYZER_MODEL}-{EXECUTOR_MODEL}", should_cache=_is_structured_design)
+def analyze_and_design_tasks(project_idea: str, target_audience: str = "general users", timeline: str = "8 weeks", two_pass: bool = False) -> Dict:
+    """Main function to analyze project and generate custom tasks
+
+    two_pass runs analysis and task generation as separate calls, which is
+    slower but handy for debugging the analysis on its own.
+    """
 
     print("🔍 ANALYZING PROJECT REQUIREMENTS...")
     print("=" * 50)
 
-    designer = TaskDesignerAgent()
+    designer = get_designer()
 
-    # Step 1: Analyze the project
-    print("📊 Running project analysis...")
-    analysis = designer.analyze_project(project_idea, target_audience, timeline)
+    if two_pass:
+        # Step 1: Analyze the project
+        print("📊 Running project analysis...")
+        analysis = designer.analyze_project(project_idea, target_audience, timeline)
 
-    # Step 2: Generate custom tasks
-    print("🛠️ Generating custom development tasks...")
-    custom_tasks = designer.generate_custom_tasks(analysis)
+        # Step 2: Generate custom tasks
+        print("🛠️ Generating custom development tasks...")
+        custom_tasks, structured = designer._design_tasks(analysis)
+    else:
+        # Steps 1+2: Analysis and task design in a single call
+        print("📊 Running project analysis and task design...")
+        plan = designer.analyze_and_design_combined(project_idea, target_audience, timeline)
+        analysis = plan['analysis']
+        custom_tasks = plan['custom_tasks']
+        structured = plan['structured']
 
     # Step 3: Create project guide
     print("📚 Creating project development guide...")
@@ -328,7 +469,8 @@ def analyze_and_design_tasks(project_idea: str, target_audience: str = "general
         'custom_tasks': custom_tasks,
         'project_guide': guide,
         'project_type': 'Detected from analysis',
-        'recommended_approach': 'Custom task-driven development'
+        'recommended_approach': 'Custom task-driven development',
+        'structured_output': structured
     }
 
     print(f"✅ Analysis complete! Generated {len(custom_tasks)} custom tasks")
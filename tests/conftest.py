@@ -0,0 +1,6 @@
+"""Shared test setup"""
+
+import os
+
+# Keep the LLM response cache from writing .llm_cache.db into the working tree
+os.environ["LLM_CACHE"] = "off"
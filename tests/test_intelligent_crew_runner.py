@@ -0,0 +1,99 @@
+"""Tests for task de-duplication and result collection in the crew runner"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+import intelligent_crew_runner
+from intelligent_crew_runner import find_duplicate_tasks
+
+# Unit vectors by task name; near-identical directions stand for near-duplicate prompts
+VECTORS = {
+    'Game Loop': [1.0, 0.0, 0.0],
+    'Main Loop': [0.999, 0.04, 0.0],
+    'Scoring': [0.0, 1.0, 0.0],
+    'Score Board': [0.03, 0.9995, 0.0],
+    'Sound': [0.0, 0.0, 1.0],
+    'Game Loop Again': [1.0, 0.0, 0.0],
+}
+
+
+class FakeEmbeddings:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    def embed_documents(self, texts):
+        return [VECTORS[text.split('\n')[0]] for text in texts]
+
+
+def _tasks(*names):
+    return [{'name': name, 'description': f"Build the {name.lower()}"} for name in names]
+
+
+def test_find_duplicate_tasks_maps_near_duplicates_to_their_representative(monkeypatch):
+    monkeypatch.setattr(intelligent_crew_runner, 'OpenAIEmbeddings', FakeEmbeddings)
+    tasks = _tasks('Game Loop', 'Main Loop', 'Scoring', 'Score Board', 'Sound', 'Game Loop Again')
+
+    assert find_duplicate_tasks(tasks, threshold=0.95) == {2: 1, 4: 3, 6: 1}
+
+
+def test_find_duplicate_tasks_respects_threshold(monkeypatch):
+    monkeypatch.setattr(intelligent_crew_runner, 'OpenAIEmbeddings', FakeEmbeddings)
+    tasks = _tasks('Game Loop', 'Main Loop', 'Scoring', 'Sound')
+
+    assert find_duplicate_tasks(tasks, threshold=0.9999) == {}
+
+
+def test_collect_results_keeps_original_task_order():
+    runner = intelligent_crew_runner.IntelligentCrewRunner.__new__(intelligent_crew_runner.IntelligentCrewRunner)
+    tasks = _tasks('Project Setup', 'Game Loop', 'Sound', 'Scoring')
+    # Tasks finish out of order; task 4 is still running
+    completed = {
+        3: {'result': 'sound'},
+        1: {'result': 'setup'},
+        2: {'error': 'timed out'},
+    }
+
+    results = runner._collect_results(tasks, completed)
+
+    assert list(results) == ['task_1_project_setup', 'task_2_failed', 'task_3_sound']
+    assert results['task_2_failed'] == {'error': 'timed out'}
+
+
+def test_task_stream_writer_drops_writes_after_close(tmp_path):
+    path = tmp_path / "task_1.jsonl"
+    writer = intelligent_crew_runner.TaskStreamWriter(str(path))
+
+    writer.write("hello")
+    writer.close()
+    writer.write("late chunk")
+
+    assert orjson.loads(path.read_bytes()) == {'token': "hello"}
+
+
+def test_write_checkpoint_reports_failures_instead_of_raising(tmp_path, capsys):
+    intelligent_crew_runner._write_checkpoint(str(tmp_path / "missing" / "out.json"), {'task_1': {}})
+
+    assert "Could not write checkpoint" in capsys.readouterr().out
+
+
+def test_execute_with_retry_hands_back_a_timed_out_call_that_is_still_running():
+    runner = intelligent_crew_runner.IntelligentCrewRunner.__new__(intelligent_crew_runner.IntelligentCrewRunner)
+    runner.task_timeout = 0.05
+    release = threading.Event()
+    crew_task = SimpleNamespace(execute_sync=lambda: release.wait(5) and "late result")
+    abandoned = []
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await runner._execute_with_retry(crew_task, "sk-a", 100, abandoned)
+        call, = abandoned
+        assert not call.done()
+
+        release.set()
+        return await call
+
+    assert asyncio.run(scenario()) == "late result"
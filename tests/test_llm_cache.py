@@ -0,0 +1,141 @@
+"""Tests for the on-disk result cache and in-flight call coalescing"""
+
+import glob
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+import llm_cache
+from llm_cache import SingleFlight, disk_cached
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, 'CACHE_DIR', str(tmp_path))
+    return tmp_path
+
+
+def _cached_counter(ttl):
+    calls = []
+
+    @disk_cached(ttl=ttl, tag="test")
+    def design(idea, audience="general users"):
+        calls.append(idea)
+        return {'idea': idea, 'audience': audience}
+
+    return design, calls
+
+
+def test_disk_cached_serves_repeat_calls_from_disk(cache_dir):
+    design, calls = _cached_counter("1h")
+
+    assert design("tetris") == design("tetris", audience="general users")
+    assert calls == ["tetris"]
+    assert len(glob.glob(str(cache_dir / "*.pkl.zst"))) == 1
+
+
+def test_disk_cached_recomputes_expired_entries(cache_dir):
+    design, calls = _cached_counter("1h")
+    design("tetris")
+
+    cache_file, = glob.glob(str(cache_dir / "*.pkl.zst"))
+    two_hours_ago = time.time() - 7200
+    os.utime(cache_file, (two_hours_ago, two_hours_ago))
+
+    design("tetris")
+    assert calls == ["tetris", "tetris"]
+
+
+def test_disk_cached_recomputes_and_rewrites_corrupt_entries(cache_dir):
+    design, calls = _cached_counter("1h")
+    design("tetris")
+
+    cache_file, = glob.glob(str(cache_dir / "*.pkl.zst"))
+    with open(cache_file, 'wb') as f:
+        f.write(b"not a zstd frame")
+
+    assert design("tetris") == {'idea': "tetris", 'audience': "general users"}
+    assert design("tetris") == {'idea': "tetris", 'audience': "general users"}
+    assert calls == ["tetris", "tetris"]
+
+
+def test_disk_cached_does_not_write_results_rejected_by_should_cache(cache_dir):
+    calls = []
+
+    @disk_cached(ttl="1h", tag="test", should_cache=lambda result: result['structured'])
+    def design(idea, structured):
+        calls.append(idea)
+        return {'idea': idea, 'structured': structured}
+
+    design("tetris", structured=False)
+    design("tetris", structured=False)
+    assert calls == ["tetris", "tetris"]
+    assert glob.glob(str(cache_dir / "*.pkl.zst")) == []
+
+    design("tetris", structured=True)
+    design("tetris", structured=True)
+    assert calls == ["tetris", "tetris", "tetris"]
+
+
+class Design:
+    def __init__(self, idea):
+        self.idea = idea
+
+
+def test_disk_cached_recomputes_entries_whose_class_no_longer_exists(cache_dir, monkeypatch):
+    calls = []
+    design_cls = Design
+
+    @disk_cached(ttl="1h", tag="test")
+    def design(idea):
+        calls.append(idea)
+        return design_cls(idea)
+
+    design("tetris")
+    # Unpickling the entry now fails with AttributeError, as after a class is renamed
+    monkeypatch.delattr(sys.modules[__name__], 'Design')
+
+    assert design("tetris").idea == "tetris"
+    assert calls == ["tetris", "tetris"]
+
+
+@pytest.mark.parametrize('ttl, seconds', [("30m", 1800), ("12h", 43200), ("7d", 604800), ("90", 90)])
+def test_parse_ttl(ttl, seconds):
+    assert llm_cache._parse_ttl(ttl) == seconds
+
+
+def test_single_flight_releases_key_when_the_call_fails():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def failing_call():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    def call():
+        try:
+            flight.do("prompt", failing_call)
+        except RuntimeError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert not follower.is_alive()
+    assert len(errors) == 2
+    # A failed call must not leave later callers waiting on its key
+    assert flight.do("prompt", lambda: "ok") == "ok"
+    assert flight._calls == {}
@@ -0,0 +1,111 @@
+"""Tests for per-key, per-model rate limit tracking and key selection"""
+
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+import openai_client
+import rate_limiter
+from openai_client import KeyRotator
+
+LIMIT_HEADERS = {
+    'x-ratelimit-limit-requests': '10000',
+    'x-ratelimit-limit-tokens': '10000000',
+    'x-ratelimit-remaining-tokens': '0',
+    'x-ratelimit-reset-tokens': '6m0s',
+}
+
+
+@pytest.fixture
+def rotator(monkeypatch):
+    rotator = KeyRotator(['sk-a', 'sk-b'], rpm=500, tpm=30000)
+    monkeypatch.setattr(openai_client, 'get_key_rotator', lambda: rotator)
+    return rotator
+
+
+def _response(path, model, api_key='sk-a'):
+    request = httpx.Request(
+        'POST', f"https://api.openai.com/v1/{path}",
+        headers={'Authorization': f"Bearer {api_key}"},
+        json={'model': model, 'input': 'hello'}
+    )
+    return httpx.Response(200, headers=LIMIT_HEADERS, request=request)
+
+
+def test_embeddings_response_does_not_retune_the_executor_limiter(rotator):
+    executor = rotator.limiter_for('sk-a', 'gpt-4o')
+
+    openai_client._record_rate_limits(_response('embeddings', 'text-embedding-3-small'))
+
+    assert (executor.rpm, executor.tpm) == (500, 30000)
+    assert executor.try_acquire(100) == 0
+    embeddings = rotator.limiter_for('sk-a', 'text-embedding-3-small')
+    assert (embeddings.rpm, embeddings.tpm) == (10000, 10000000)
+    assert embeddings.try_acquire(100) == pytest.approx(360, abs=1)
+
+
+def test_chat_response_retunes_only_its_own_key_and_model(rotator):
+    openai_client._record_rate_limits(_response('chat/completions', 'gpt-4o', api_key='sk-b'))
+
+    assert rotator.limiter_for('sk-b', 'gpt-4o').tpm == 10000000
+    assert rotator.limiter_for('sk-a', 'gpt-4o').tpm == 30000
+    assert rotator.limiter_for('sk-b', 'gpt-4o-mini').tpm == 30000
+
+
+def test_responses_without_a_model_or_known_key_are_ignored(rotator):
+    warm_up = httpx.Response(
+        200, headers=LIMIT_HEADERS,
+        request=httpx.Request('HEAD', 'https://api.openai.com/v1/models', headers={'Authorization': 'Bearer sk-a'})
+    )
+    openai_client._record_rate_limits(warm_up)
+    openai_client._record_rate_limits(_response('chat/completions', 'gpt-4o', api_key='sk-unknown'))
+
+    assert rotator.limiters == {}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen monotonic clock for the limiters behind a KeyRotator"""
+
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(rate_limiter, 'time', SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def test_try_acquire_picks_the_key_with_the_most_budget_left(clock):
+    rotator = KeyRotator(['sk-a', 'sk-b'], rpm=100, tpm=100)
+    rotator.limiter_for('sk-a', 'gpt-4o').try_acquire(50)
+
+    assert rotator._try_acquire(10, 'gpt-4o') == ('sk-b', 0.0)
+    assert rotator.limiter_for('sk-b', 'gpt-4o').remaining_tokens() == 90
+
+
+def test_try_acquire_falls_through_when_the_least_loaded_key_is_out_of_requests(clock):
+    rotator = KeyRotator(['sk-a', 'sk-b'], rpm=2, tpm=100)
+    rotator.limiter_for('sk-a', 'gpt-4o').try_acquire(1)
+    rotator.limiter_for('sk-a', 'gpt-4o').try_acquire(1)
+    rotator.limiter_for('sk-b', 'gpt-4o').try_acquire(20)
+
+    assert rotator._try_acquire(10, 'gpt-4o') == ('sk-b', 0.0)
+
+
+def test_try_acquire_returns_the_shortest_wait_when_every_key_is_exhausted(clock):
+    rotator = KeyRotator(['sk-a', 'sk-b'], rpm=1, tpm=100)
+    rotator.limiter_for('sk-b', 'gpt-4o').try_acquire(10)
+    clock.value += 10
+    rotator.limiter_for('sk-a', 'gpt-4o').try_acquire(10)
+    clock.value += 10
+
+    key, wait = rotator._try_acquire(10, 'gpt-4o')
+    assert key is None
+    assert wait == pytest.approx(40)
+
+
+def test_try_acquire_can_be_restricted_to_one_key(clock):
+    rotator = KeyRotator(['sk-a', 'sk-b'], rpm=100, tpm=100)
+    rotator.limiter_for('sk-a', 'gpt-4o').try_acquire(95)
+
+    key, wait = rotator._try_acquire(10, 'gpt-4o', keys=['sk-a'])
+    assert key is None
+    assert wait == pytest.approx(60)
@@ -0,0 +1,48 @@
+"""Tests for inlining project sources into the improvement prompt"""
+
+import pytest
+
+import openai_client
+import project_improver
+from project_improver import format_project_sources
+
+
+class WordEncoder:
+    """One token per whitespace-separated word, so budgets are easy to count"""
+
+    def encode(self, text, disallowed_special=()):
+        return text.split()
+
+    def decode(self, tokens):
+        return ' '.join(tokens)
+
+
+@pytest.fixture(autouse=True)
+def word_tokens(monkeypatch):
+    monkeypatch.setattr(openai_client, '_load_encoder', lambda model: WordEncoder())
+    monkeypatch.setattr(project_improver, 'FILE_TOKEN_LIMIT', 6)
+    monkeypatch.setattr(project_improver, 'SOURCE_TOKEN_BUDGET', 14)
+
+
+def _words(prefix, n):
+    return ' '.join(f"{prefix}{i}" for i in range(n))
+
+
+def test_format_project_sources_inlines_files_within_budget_unchanged():
+    sources = format_project_sources({'index.html': _words('h', 3), 'game.js': _words('g', 5)})
+
+    assert sources == f"--- index.html ---\n{_words('h', 3)}\n--- game.js ---\n{_words('g', 5)}"
+
+
+def test_format_project_sources_truncates_and_lists_files_past_the_budget():
+    sources = format_project_sources({
+        'game.js': _words('g', 10),
+        'style.css': _words('s', 10),
+        'sound.js': _words('x', 3),
+    })
+
+    # game.js is capped per file; its marker uses 4 tokens, leaving 4 for style.css
+    assert f"--- game.js ---\n{_words('g', 6)}\n... [truncated 4 tokens]" in sources
+    assert f"--- style.css ---\n{_words('s', 4)}\n... [truncated 6 tokens]" in sources
+    assert sources.endswith("--- Not shown (source token budget reached): sound.js ---")
+    assert 'x0' not in sources
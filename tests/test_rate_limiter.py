@@ -0,0 +1,111 @@
+"""Tests for the rolling-window rate limiter"""
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import pytest
+
+import rate_limiter
+from rate_limiter import RateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen monotonic clock that tests advance by hand"""
+
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(rate_limiter, 'time', SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def test_try_acquire_waits_for_oldest_request_when_rpm_is_used_up(clock):
+    limiter = RateLimiter(rpm=2, tpm=1_000_000, window=60)
+
+    assert limiter.try_acquire(10) == 0
+    clock.value += 10
+    assert limiter.try_acquire(10) == 0
+    assert limiter.try_acquire(10) == pytest.approx(50)
+
+    clock.value += 50
+    assert limiter.try_acquire(10) == 0
+
+
+def test_try_acquire_waits_for_token_budget(clock):
+    limiter = RateLimiter(rpm=100, tpm=100, window=60)
+
+    assert limiter.try_acquire(60) == 0
+    clock.value += 10
+    assert limiter.try_acquire(50) == pytest.approx(50)
+    assert limiter.remaining_tokens() == 40
+
+    clock.value += 50
+    assert limiter.try_acquire(50) == 0
+
+
+def test_try_acquire_lets_oversized_request_through_an_empty_window(clock):
+    limiter = RateLimiter(rpm=100, tpm=100, window=60)
+
+    assert limiter.try_acquire(500) == 0
+    assert limiter.try_acquire(1) == pytest.approx(60)
+    assert limiter.remaining_tokens() == 0
+
+
+def test_block_for_pauses_new_requests(clock):
+    limiter = RateLimiter(rpm=100, tpm=100, window=60)
+    limiter.block_for(5)
+
+    assert limiter.try_acquire(1) == pytest.approx(5)
+    assert limiter.remaining_tokens() == 0
+
+    clock.value += 5
+    assert limiter.try_acquire(1) == 0
+
+
+def test_update_from_headers_retunes_limits_and_blocks_when_exhausted(clock):
+    limiter = RateLimiter(rpm=100, tpm=100, window=60)
+    limiter.update_from_headers({
+        'X-RateLimit-Limit-Requests': '500',
+        'X-RateLimit-Limit-Tokens': '30000',
+        'X-RateLimit-Remaining-Tokens': '0',
+        'X-RateLimit-Reset-Tokens': '6m0s',
+    })
+
+    assert (limiter.rpm, limiter.tpm) == (500, 30000)
+    assert limiter.try_acquire(1) == pytest.approx(360)
+
+
+@pytest.mark.parametrize('value, seconds', [
+    ('6m0s', 360.0),
+    ('20ms', 0.02),
+    ('1h2m3.5s', 3723.5),
+    ('0.5s', 0.5),
+    ('1.5', 1.5),
+])
+def test_parse_duration(value, seconds):
+    assert rate_limiter._parse_duration(value) == pytest.approx(seconds)
+
+
+@pytest.mark.parametrize('value', [None, '', 'soon'])
+def test_parse_duration_rejects_unparseable_values(value):
+    assert rate_limiter._parse_duration(value) is None
+
+
+def test_parse_retry_after_value_accepts_seconds_and_http_dates():
+    future = datetime.now(timezone.utc) + timedelta(seconds=120)
+    past = datetime.now(timezone.utc) - timedelta(seconds=120)
+
+    assert rate_limiter._parse_retry_after_value('30') == 30
+    assert rate_limiter._parse_retry_after_value(format_datetime(future, usegmt=True)) == pytest.approx(120, abs=2)
+    assert rate_limiter._parse_retry_after_value(format_datetime(past, usegmt=True)) == 0.0
+    assert rate_limiter._parse_retry_after_value('not a date') is None
+
+
+def test_parse_retry_after_falls_back_to_longest_reset_header():
+    error = SimpleNamespace(response=SimpleNamespace(headers={
+        'x-ratelimit-reset-requests': '20ms',
+        'x-ratelimit-reset-tokens': '6m0s',
+    }))
+
+    assert rate_limiter.parse_retry_after(error) == pytest.approx(360)
+    assert rate_limiter.parse_retry_after(ValueError()) is None